@@ -1,20 +1,37 @@
 
 import streamlit as st
-import pandas as pd
-import openpyxl
 import os
 import json
-import uuid
-import base64
+import datetime
+import hashlib
+import pickle
 import zipfile
 import sys
 import re
 import subprocess
 import tempfile
+import time
 import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
 from typing import Optional, Tuple
+from xml.etree import ElementTree
 from dotenv import load_dotenv
 
+try:
+    # Rust-based reader, much faster than openpyxl at listing sheets
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+try:
+    # Compact binary format for the generated forms cache, which is skipped without it
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # Configure logging for debugging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,18 +39,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Function to get the current git commit hash
-def get_git_commit():
+# Function to get the current git commit hash and date, cached with st.cache_resource because Streamlit re-executes this script on every rerun
+@st.cache_resource(show_spinner=False)
+def get_git_version() -> Tuple[str, str]:
+    """
+    Return the short hash and the date (YYYY-MM-DD) of the current git commit.
+    """
     try:
-        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).decode('ascii').strip()
-    except:
-        return "unknown"
-    
-def get_git_commit_date():
+        commit_hash, commit_date_unix = subprocess.check_output(
+            ['git', 'log', '-1', '--format=%h %ct', 'HEAD']
+        ).decode('ascii').split()
+    except Exception:
+        return "unknown", "unknown"
     try:
-        return subprocess.check_output(['git', 'show', '-s', '--format=%ct', get_git_commit()]).decode('ascii').strip()
+        commit_date_str = datetime.datetime.fromtimestamp(int(commit_date_unix), datetime.UTC).strftime('%Y-%m-%d')
     except Exception:
-        return "unknown"
+        commit_date_str = "unknown"
+    return commit_hash, commit_date_str
 
 # Load environment variables
 load_dotenv()
@@ -45,22 +67,139 @@ os.environ['METADATA_FILEPATH'] = ''
 # Import the existing form generation functions
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.form_generator import (
-    generate_form,
-    generate_translation_file,
-    initialize_option_sets
+    dumps_json,
+    generate_worker_form_outputs,
+    load_option_sets,
+    loads_json
+)
+import src.form_generator as fg
+
+# Parsed OptionSets tables are kept here, keyed by the hash of the uploaded workbook and the
+# generator code, so that restarting the app does not require re-parsing the same file
+OPTION_SETS_CACHE_DIR = os.path.join('.cache', 'option_sets')
+OPTION_SETS_CACHE_MAX_FILES = 32
+
+# Generation results are kept here, keyed by workbook, sheet, column mappings and generator code
+GENERATED_FORMS_CACHE_DIR = os.path.join('.cache', 'generated_forms')
+GENERATED_FORMS_CACHE_MAX_FILES = 256
+FORM_GENERATOR_VERSION = hashlib.blake2b(Path(fg.__file__).read_bytes(), digest_size=8).hexdigest()
+
+# Forms are generated by a few worker processes, started through a fork server (spawned where
+# it is unavailable) since forking the multi-threaded Streamlit server can deadlock. The pool
+# is kept for the life of the server, see get_form_executor
+FORM_WORKERS_MAX = 4
+if 'forkserver' in multiprocessing.get_all_start_methods():
+    FORM_WORKER_CONTEXT = multiprocessing.get_context('forkserver')
+    FORM_WORKER_CONTEXT.set_forkserver_preload(['src.form_generator'])
+else:
+    FORM_WORKER_CONTEXT = multiprocessing.get_context('spawn')
+
+# Namespaces of the sheet elements in xl/workbook.xml, transitional and strict OOXML,
+# used to list sheets without openpyxl
+SPREADSHEETML_NAMESPACES = (
+    'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'http://purl.oclc.org/ooxml/spreadsheetml/main'
 )
 
+# Sidebar layout: custom CSS for vertical alignment and the opening of the content div
+SIDEBAR_HEADER_HTML = """
+<style>
+[data-testid="stSidebar"] {
+    display: flex;
+    flex-direction: column;
+}
+.sidebar-content {
+    flex-grow: 1;
+}
+.sidebar-footer {
+    margin-top: auto;
+    text-align: center;
+    padding-bottom: 20px;
+}
+</style>
+<div class="sidebar-content">
+"""
+
+# Closes the content div and starts the footer with the "Powered by" text
+SIDEBAR_FOOTER_HTML = "</div><div class='sidebar-footer'><p style='color: #888; font-size: 0.8em;'>Powered by</p>"
+MADIRO_LOGO_URL = "https://raw.githubusercontent.com/MadiroGlobalHealth/clinical-content-tools/refs/heads/main/.github/workflows/madiro.png"
+
+# JSON previews show this much of the files unless the full JSON is requested
+PREVIEW_MAX_BYTES = 8192
+
+# Default column mappings, matching the column names of the metadata template
+DEFAULT_COLUMN_MAPPINGS = {
+    "QUESTION_COLUMN": "Question",
+    "LABEL_COLUMN": "Label if different",
+    "QUESTION_ID_COLUMN": "Question ID",
+    "EXTERNAL_ID_COLUMN": "External ID",
+    "DATATYPE_COLUMN": "Datatype",
+    "VALIDATION_COLUMN": "Validation (format)",
+    "MANDATORY_COLUMN": "Mandatory",
+    "RENDERING_COLUMN": "Rendering",
+    "LOWER_LIMIT_COLUMN": "Lower limit",
+    "UPPER_LIMIT_COLUMN": "Upper limit",
+    "DEFAULT_VALUE_COLUMN": "Default value",
+    "CALCULATION_COLUMN": "Calculation",
+    "SKIP_LOGIC_COLUMN": "Skip logic",
+    "PAGE_COLUMN": "Page",
+    "SECTION_COLUMN": "Section",
+    "OPTION_SET_COLUMN": "OptionSet name",
+    "TOOLTIP_COLUMN_NAME": "Tooltip",
+    "TRANSLATION_SECTION_COLUMN": "Translation - Section",
+    "TRANSLATION_QUESTION_COLUMN": "Translation - Question",
+    "TRANSLATION_TOOLTIP_COLUMN": "Translation - Tooltip",
+    "TRANSLATION_ANSWER_COLUMN": "Translation"
+}
+
+# Column mapping inputs of the Configuration page: (group, column, setting, label)
+COLUMN_FIELDS = [
+    ("Basic Question Fields", 0, "QUESTION_COLUMN", "Question Column"),
+    ("Basic Question Fields", 0, "LABEL_COLUMN", "Label Column"),
+    ("Basic Question Fields", 0, "QUESTION_ID_COLUMN", "Question ID Column"),
+    ("Basic Question Fields", 0, "EXTERNAL_ID_COLUMN", "External ID Column"),
+    ("Basic Question Fields", 1, "DATATYPE_COLUMN", "Datatype Column"),
+    ("Basic Question Fields", 1, "MANDATORY_COLUMN", "Mandatory Column"),
+    ("Basic Question Fields", 1, "RENDERING_COLUMN", "Rendering Column"),
+    ("Basic Question Fields", 1, "TOOLTIP_COLUMN_NAME", "Tooltip Column"),
+    ("Layout and Organization", 0, "PAGE_COLUMN", "Page Column"),
+    ("Layout and Organization", 0, "SECTION_COLUMN", "Section Column"),
+    ("Layout and Organization", 0, "OPTION_SET_COLUMN", "Option Set Column"),
+    ("Validation and Calculation", 0, "VALIDATION_COLUMN", "Validation Column"),
+    ("Validation and Calculation", 0, "LOWER_LIMIT_COLUMN", "Lower Limit Column"),
+    ("Validation and Calculation", 0, "UPPER_LIMIT_COLUMN", "Upper Limit Column"),
+    ("Validation and Calculation", 1, "DEFAULT_VALUE_COLUMN", "Default Value Column"),
+    ("Validation and Calculation", 1, "CALCULATION_COLUMN", "Calculation Column"),
+    ("Validation and Calculation", 1, "SKIP_LOGIC_COLUMN", "Skip Logic Column"),
+    ("Translation Fields", 0, "TRANSLATION_SECTION_COLUMN", "Translation Section Column"),
+    ("Translation Fields", 0, "TRANSLATION_QUESTION_COLUMN", "Translation Question Column"),
+    ("Translation Fields", 1, "TRANSLATION_TOOLTIP_COLUMN", "Translation Tooltip Column"),
+    ("Translation Fields", 1, "TRANSLATION_ANSWER_COLUMN", "Translation Answer Column")
+]
+
+@st.cache_data(show_spinner=False)
+def read_config_file(mtime: float) -> dict:
+    """
+    Parse config.json, once per modification time of the file.
+
+    Args:
+        mtime: Modification time of config.json, only used as the cache key
+
+    Returns:
+        dict: The configuration, with the default settings when it has none
+    """
+    config = loads_json(Path('config.json').read_bytes())
+
+    # Ensure settings section exists
+    if "settings" not in config:
+        config["settings"] = get_default_app_settings()
+
+    return config
+
 # Load the configuration settings from config.json
 def load_config():
     try:
-        with open('config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
-
-            # Ensure settings section exists
-            if "settings" not in config:
-                config["settings"] = get_default_app_settings()
-
-            return config
+        return read_config_file(os.path.getmtime('config.json'))
     except Exception as e:
         st.error(f"Error loading configuration: {str(e)}")
         return {
@@ -73,9 +212,17 @@ def save_config(config):
     """
     Save configuration to config.json
     """
+    # Saving without changes would only bump the mtime and invalidate the cached config
+    try:
+        if loads_json(Path('config.json').read_bytes()) == config:
+            return True
+    except Exception:
+        pass
+
     try:
-        with open('config.json', 'w', encoding='utf-8') as f:
-            json.dump(config, indent=4, fp=f)
+        Path('config.json').write_bytes(dumps_json(config, sort_keys=True))
+        # Do not rely on the mtime bump alone, its resolution is coarse on some file systems
+        read_config_file.clear()
         return True
     except Exception as e:
         st.error(f"Error saving configuration: {str(e)}")
@@ -86,29 +233,7 @@ def get_default_column_mappings():
     """
     Return the default column mappings
     """
-    return {
-        "QUESTION_COLUMN": "Question",
-        "LABEL_COLUMN": "Label if different",
-        "QUESTION_ID_COLUMN": "Question ID",
-        "EXTERNAL_ID_COLUMN": "External ID",
-        "DATATYPE_COLUMN": "Datatype",
-        "VALIDATION_COLUMN": "Validation (format)",
-        "MANDATORY_COLUMN": "Mandatory",
-        "RENDERING_COLUMN": "Rendering",
-        "LOWER_LIMIT_COLUMN": "Lower limit",
-        "UPPER_LIMIT_COLUMN": "Upper limit",
-        "DEFAULT_VALUE_COLUMN": "Default value",
-        "CALCULATION_COLUMN": "Calculation",
-        "SKIP_LOGIC_COLUMN": "Skip logic",
-        "PAGE_COLUMN": "Page",
-        "SECTION_COLUMN": "Section",
-        "OPTION_SET_COLUMN": "OptionSet name",
-        "TOOLTIP_COLUMN_NAME": "Tooltip",
-        "TRANSLATION_SECTION_COLUMN": "Translation - Section",
-        "TRANSLATION_QUESTION_COLUMN": "Translation - Question",
-        "TRANSLATION_TOOLTIP_COLUMN": "Translation - Tooltip",
-        "TRANSLATION_ANSWER_COLUMN": "Translation"
-    }
+    return dict(DEFAULT_COLUMN_MAPPINGS)
 
 def get_default_app_settings():
     """
@@ -118,17 +243,33 @@ def get_default_app_settings():
         "SHEET_FILTER_PREFIX": "F\\d{2}"  # Default: "F" followed by 2 digits
     }
 
-def get_download_link(filepath, filename):
+@st.cache_resource(show_spinner=False)
+def compile_sheet_filter(sheet_filter_prefix: str) -> re.Pattern:
     """
-    Generate a download link for a file
+    Compile the configured sheet filter prefix, once per distinct prefix.
+
+    Args:
+        sheet_filter_prefix: Regular expression the form sheet names start with
+
+    Returns:
+        re.Pattern: Pattern to match() against the sheet names, which anchors it at their start
     """
-    with open(filepath, 'rb') as f:
-        bytes = f.read()
-        b64 = base64.b64encode(bytes).decode()
-        href = f'<a href="data:file/json;base64,{b64}" download="{filename}">Download {filename}</a>'
-        return href
+    return re.compile(sheet_filter_prefix)
 
-def safe_file_handler(uploaded_file) -> Tuple[Optional[str], str]:
+@st.cache_resource(show_spinner=False)
+def get_form_executor() -> ProcessPoolExecutor:
+    """
+    Return the pool of worker processes generating forms, shared by all sessions and reruns.
+
+    Workers are started on demand and kept, as starting one re-imports this script and its
+    dependencies. Tasks carry the workbook they generate from, see generate_worker_form_outputs.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(os.cpu_count() or 1, FORM_WORKERS_MAX)),
+        mp_context=FORM_WORKER_CONTEXT
+    )
+
+def safe_file_handler(uploaded_file) -> Tuple[Optional[str], Optional[str], str]:
     """
     Safely handle uploaded file with proper error handling for Streamlit Cloud.
     
@@ -136,44 +277,44 @@ def safe_file_handler(uploaded_file) -> Tuple[Optional[str], str]:
         uploaded_file: Streamlit uploaded file object
         
     Returns:
-        Tuple[Optional[str], str]: (temp_file_path, error_message)
+        Tuple[Optional[str], Optional[str], str]: (temp_file_path, file_hash, error_message),
+            the hash identifying the file content for the caches
     """
     try:
         # Check file size (limit to 50MB for safety)
-        file_size = len(uploaded_file.getvalue())
+        file_size = uploaded_file.size
         logger.info(f"Processing file: {uploaded_file.name}, size: {file_size / (1024*1024):.2f} MB")
         
         if file_size > 50 * 1024 * 1024:  # 50MB limit
-            return None, "File size exceeds 50MB limit. Please use a smaller file."
+            return None, None, "File size exceeds 50MB limit. Please use a smaller file."
         
-        # Use tempfile for cross-platform compatibility
+        # Use tempfile for cross-platform compatibility, copying the upload in 1 MB chunks
+        # and hashing them on the way rather than in a second pass over the content
+        file_hash = hashlib.blake2b(digest_size=16)
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx', prefix='formgen_') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
+            uploaded_file.seek(0)
+            for chunk in iter(lambda: uploaded_file.read(1024 * 1024), b''):
+                file_hash.update(chunk)
+                tmp_file.write(chunk)
             temp_path = tmp_file.name
             
-        # Validate file immediately after creation
-        try:
-            wb = openpyxl.load_workbook(temp_path, read_only=True, data_only=True)
-            try:
-                sheet_names = wb.sheetnames
-                logger.info(f"Successfully validated Excel file with {len(wb.sheetnames)} sheets")
-            finally:
-                wb.close()
-        except Exception as e:
+        # Validate file immediately after creation, the workbook itself is parsed when reading its sheets
+        if not is_xlsx_file(temp_path):
             # Clean up temp file if validation fails
             try:
                 os.unlink(temp_path)
             except:
                 pass
-            return None, f"Invalid Excel file: {str(e)}"
+            return None, None, "Invalid Excel file: the file is not in .xlsx format."
+        logger.info(f"Validated Excel file header: {temp_path}")
             
-        return temp_path, ""
+        return temp_path, file_hash.hexdigest(), ""
         
     except MemoryError:
-        return None, "File too large to process. Please reduce file size or split into smaller files."
+        return None, None, "File too large to process. Please reduce file size or split into smaller files."
     except Exception as e:
         logger.error(f"Error handling file: {str(e)}")
-        return None, f"Error processing file: {str(e)}"
+        return None, None, f"Error processing file: {str(e)}"
 
 def cleanup_temp_file(file_path: Optional[str]) -> None:
     """
@@ -189,18 +330,280 @@ def cleanup_temp_file(file_path: Optional[str]) -> None:
         except Exception as e:
             logger.warning(f"Could not clean up temp file {file_path}: {str(e)}")
 
-def generate_forms_from_sheets(metadata_file, selected_sheets):
+def read_sheet_names(file_path: str) -> list:
+    """
+    Read the sheet names of an Excel file, using calamine when it is installed.
+
+    Without calamine only xl/workbook.xml is parsed, instead of loading the
+    styles and shared strings of the whole workbook with openpyxl.
+
+    Args:
+        file_path: Path to the Excel file
+
+    Returns:
+        list: Sheet names in workbook order
+
+    Raises:
+        zipfile.BadZipFile: If the file has no readable xl/workbook.xml
+    """
+    if CalamineWorkbook is not None:
+        with CalamineWorkbook.from_path(file_path) as wb:
+            return list(wb.sheet_names)
+
+    with zipfile.ZipFile(file_path) as archive:
+        try:
+            root = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        except (KeyError, ElementTree.ParseError) as e:
+            # Not a missing sheet: the workbook part itself is missing or broken
+            raise zipfile.BadZipFile(f"Unreadable workbook, no valid xl/workbook.xml: {str(e)}") from e
+    return [
+        sheet.get('name')
+        for namespace in SPREADSHEETML_NAMESPACES
+        for sheet in root.iter(f'{{{namespace}}}sheet')
+    ]
+
+def get_file_hash(file_path: str) -> str:
+    """
+    Hash the content of a file the same way safe_file_handler hashes uploads.
+
+    Args:
+        file_path: Path to the file to hash
+
+    Returns:
+        str: Hex digest identifying the file content
+    """
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+def is_xlsx_file(file_path: str) -> bool:
+    """
+    Check that a file starts with the zip signature used by all xlsx-family formats.
+
+    Args:
+        file_path: Path to the file to check
+
+    Returns:
+        bool: True if the file looks like a zip container
     """
-    Generate forms from selected sheets
+    with open(file_path, 'rb') as f:
+        return f.read(4) == b'PK\x03\x04'
+
+def get_option_sets_cache_path(file_hash: str) -> str:
     """
+    Path of the cached OptionSets table of a workbook.
+
+    The form generator version is part of the key, so tables parsed by older code
+    are not served after the way they are read changes.
+
+    Args:
+        file_hash: Hash of the workbook content
+
+    Returns:
+        str: Path of the cache file
+    """
+    return os.path.join(OPTION_SETS_CACHE_DIR, f"{file_hash}_{FORM_GENERATOR_VERSION}.pkl")
+
+def prune_cache_dir(cache_dir: str, max_files: int) -> None:
+    """
+    Remove the least recently used files of a cache directory beyond a maximum count.
+
+    Cache hits refresh the modification time of their file, which is used as the last use time.
+
+    Args:
+        cache_dir: Directory of the cache
+        max_files: Number of files to keep
+    """
+    try:
+        entries = sorted(
+            (entry for entry in os.scandir(cache_dir) if entry.is_file() and not entry.name.endswith('.tmp')),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        for entry in entries[max_files:]:
+            os.unlink(entry.path)
+    except OSError as e:
+        logger.warning(f"Could not prune cache {cache_dir}: {str(e)}")
+
+def read_cached_option_sets(file_hash: str):
+    """
+    Read the OptionSets table saved on disk for a workbook hash, if any.
+
+    Args:
+        file_hash: Hash of the workbook content
+
+    Returns:
+        The cached OptionSets table, or None on a cache miss
+    """
+    cache_path = get_option_sets_cache_path(file_hash)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            option_sets = pickle.load(f)
+        os.utime(cache_path)
+        return option_sets
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable option sets cache {cache_path}: {str(e)}")
+        return None
+
+def write_cached_option_sets(file_hash: str, option_sets) -> None:
+    """
+    Save the OptionSets table on disk for a workbook hash.
+
+    Args:
+        file_hash: Hash of the workbook content
+        option_sets: The OptionSets table to save
+    """
+    cache_path = get_option_sets_cache_path(file_hash)
+    try:
+        os.makedirs(OPTION_SETS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(option_sets, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Could not write option sets cache {cache_path}: {str(e)}")
+        return
+    prune_cache_dir(OPTION_SETS_CACHE_DIR, OPTION_SETS_CACHE_MAX_FILES)
+
+def get_form_cache_path(file_hash: str, sheet: str, column_config: dict) -> str:
+    """
+    Path of the cached generation result of a sheet.
+
+    The key covers everything the result depends on: the workbook content, the sheet,
+    the column mappings and the form generator code.
+
+    Args:
+        file_hash: Hash of the workbook content
+        sheet: Name of the sheet
+        column_config: Column mappings used for generation
+
+    Returns:
+        str: Path of the cache file
+    """
+    key = hashlib.blake2b(digest_size=16)
+    for part in (file_hash, sheet, FORM_GENERATOR_VERSION):
+        key.update(part.encode('utf-8') + b'\0')
+    key.update(json.dumps(column_config, sort_keys=True).encode('utf-8'))
+    return os.path.join(GENERATED_FORMS_CACHE_DIR, f"{key.hexdigest()}.msgpack")
+
+def read_cached_form_outputs(cache_path: str) -> Optional[dict]:
+    """
+    Read a cached generation result, if any.
+
+    Args:
+        cache_path: Path returned by get_form_cache_path
+
+    Returns:
+        The result of generate_form_outputs, marked as cached and without generation time,
+        or None on a cache miss
+    """
+    if msgpack is None or not os.path.exists(cache_path):
+        return None
     try:
-        # Enhanced file validation with better error reporting
+        with open(cache_path, 'rb') as f:
+            result = msgpack.unpackb(f.read(), raw=False)
+        os.utime(cache_path)
+        result['generation_time'] = 0.0
+        result['cached'] = True
+        return result
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable generated form cache {cache_path}: {str(e)}")
+        return None
+
+def write_cached_form_outputs(cache_path: str, result: dict) -> None:
+    """
+    Save a generation result on disk.
+
+    Args:
+        cache_path: Path returned by get_form_cache_path
+        result: The result of generate_form_outputs
+    """
+    if msgpack is None:
+        return
+    try:
+        os.makedirs(GENERATED_FORMS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(msgpack.packb(result, use_bin_type=True))
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Could not write generated form cache {cache_path}: {str(e)}")
+        return
+    prune_cache_dir(GENERATED_FORMS_CACHE_DIR, GENERATED_FORMS_CACHE_MAX_FILES)
+
+@st.cache_data(show_spinner=False)
+def load_sheet_names(file_hash: str, _metadata_file: str) -> list:
+    """
+    Read the sheet names of a workbook once per file content.
+
+    The cache is keyed on the content hash only, as the temporary path changes on every rerun.
+
+    Args:
+        file_hash: Hash of the workbook content
+        _metadata_file: Path to the workbook on disk
+
+    Returns:
+        list: Sheet names in workbook order
+    """
+    sheet_names = read_sheet_names(_metadata_file)
+    logger.info(f"Retrieved {len(sheet_names)} sheet names from Excel file")
+    return sheet_names
+
+@st.cache_resource(show_spinner=False)
+def load_workbook_option_sets(file_hash: str, _metadata_file: str):
+    """
+    Read the OptionSets table of a workbook once per file content, shared across sessions.
+
+    Args:
+        file_hash: Hash of the workbook content
+        _metadata_file: Path to the workbook on disk
+
+    Returns:
+        pd.DataFrame: The option sets
+    """
+    option_sets = read_cached_option_sets(file_hash)
+    if option_sets is None:
+        option_sets = load_option_sets(_metadata_file)
+        write_cached_option_sets(file_hash, option_sets)
+    else:
+        logger.info(f"Loaded option sets from cache for {file_hash}")
+    return option_sets
+
+def ensure_option_sets(metadata_file: str, file_hash: Optional[str] = None):
+    """
+    Return the OptionSets table of a workbook, reading the sheet only when it is not cached.
+
+    Args:
+        metadata_file: Path to the workbook on disk
+        file_hash: Optional hash of the workbook content, computed from the file when not given
+
+    Returns:
+        pd.DataFrame: The option sets
+    """
+    if not file_hash:
+        file_hash = get_file_hash(metadata_file)
+    return load_workbook_option_sets(file_hash, metadata_file)
+
+def generate_forms_from_sheets(metadata_file, selected_sheets, progress_callback=None, file_hash=None):
+    """
+    Generate forms from selected sheets, in parallel worker processes
+
+    Args:
+        metadata_file: Path to the Excel metadata file
+        selected_sheets: Names of the sheets to generate forms from
+        progress_callback: Optional callable receiving (completed_count, total_count)
+        file_hash: Optional hash of the workbook content, computed from the file when not given
+    """
+    try:
+        # Cheap check of the zip container only: the workbook itself has already been
+        # read by the upload handler, and option set / form reading reports its own errors
         try:
-            logger.info(f"Validating Excel file: {metadata_file}")
-            wb = openpyxl.load_workbook(metadata_file, read_only=True, data_only=True)
-            sheet_count = len(wb.sheetnames)
-            wb.close()
-            logger.info(f"Excel file validated successfully with {sheet_count} sheets")
+            if not is_xlsx_file(metadata_file):
+                raise zipfile.BadZipFile(f"File is not a zip container: {metadata_file}")
         except zipfile.BadZipFile:
             st.error("❌ Invalid Excel file format - file appears to be corrupted or not a valid Excel file.")
             st.info("💡 **Solutions:**")
@@ -212,13 +615,6 @@ def generate_forms_from_sheets(metadata_file, selected_sheets):
             st.error("❌ File not found - temporary file may have been cleaned up.")
             st.info("💡 Please try uploading the file again.")
             return []
-        except MemoryError:
-            st.error("❌ File too large to process - insufficient memory.")
-            st.info("💡 **Solutions:**")
-            st.info("• Try reducing the file size by removing unnecessary data")
-            st.info("• Split large files into smaller ones")
-            st.info("• Remove unused sheets from the Excel file")
-            return []
         except PermissionError:
             st.error("❌ Permission denied - cannot access the file.")
             st.info("💡 Please try uploading the file again.")
@@ -236,43 +632,68 @@ def generate_forms_from_sheets(metadata_file, selected_sheets):
         os.environ['METADATA_FILEPATH'] = metadata_file
         logger.info(f"Set METADATA_FILEPATH to: {metadata_file}")
 
-        # Initialize option sets with enhanced error handling
-        if not st.session_state.option_sets_initialized:
-            try:
-                logger.info("Initializing option sets...")
-                initialize_option_sets(metadata_file)
-                st.session_state.option_sets_initialized = True
-                logger.info("Option sets initialized successfully")
-            except Exception as e:
-                st.error(f"❌ Failed to initialize option sets: {str(e)}")
-                st.info("💡 Please ensure your Excel file has an 'OptionSets' sheet with the correct format.")
-                logger.error(f"Option sets initialization failed: {str(e)}")
-                return []
+        # Worker processes keep the workbook they last generated from, keyed by its hash
+        if not file_hash:
+            file_hash = get_file_hash(metadata_file)
+
+        # Initialize option sets with enhanced error handling, reusing the ones read on upload
+        try:
+            option_sets = ensure_option_sets(metadata_file, file_hash)
+        except Exception as e:
+            st.error(f"❌ Failed to initialize option sets: {str(e)}")
+            st.info("💡 Please ensure your Excel file has an 'OptionSets' sheet with the correct format.")
+            logger.error(f"Option sets initialization failed: {str(e)}")
+            return []
 
         # Load current configuration to ensure it's used
         config = load_config()
 
-        # Update form_generator module's configuration variables with current settings
-        import src.form_generator as fg
-        for key, value in config.get("columns", {}).items():
-            if hasattr(fg, key):
-                setattr(fg, key, value)
-
-        generated_forms = []
+        # Sheets are generated in worker processes: hand them the option sets and the
+        # current column mappings, as they do not share this process' module state
+        column_config = config.get("columns", {})
 
+        # Sheets generated before from the same workbook and mappings are not generated again
+        cache_paths = {}
+        futures = {}
         for sheet in selected_sheets:
-            translations_data = {}
-            try:
-                # Start timing the generation
-                import time
-                start_time = time.time()
+            cache_paths[sheet] = get_form_cache_path(file_hash, sheet, column_config)
+            cached_result = read_cached_form_outputs(cache_paths[sheet])
+            if cached_result is not None:
+                logger.info(f"Using cached form for sheet: {sheet}")
+                future = Future()
+                future.set_result(cached_result)
+                futures[future] = sheet
+        sheets_to_generate = [sheet for sheet in selected_sheets if sheet not in futures.values()]
+
+        # Sheets complete in any order, keep them in the order they were selected
+        start_time = time.time()
+        generated_forms = [None] * len(selected_sheets)
+        sheet_positions = {sheet: position for position, sheet in enumerate(selected_sheets)}
+        executor = get_form_executor()
+        for sheet in sheets_to_generate:
+            logger.info(f"Generating form for sheet: {sheet}")
+            future = executor.submit(
+                generate_worker_form_outputs, sheet, file_hash, option_sets, column_config, metadata_file
+            )
+            futures[future] = sheet
 
-                # Generate form and translations with enhanced error handling
-                logger.info(f"Generating form for sheet: {sheet}")
+        for completed, future in enumerate(as_completed(futures), start=1):
+            sheet = futures[future]
+            if progress_callback:
+                progress_callback(completed, len(futures))
+            try:
+                # Collect the form and translations with enhanced error handling
                 try:
-                    form, _, total_questions, total_answers, missing_option_sets, skip_logic_issues = generate_form(sheet, translations_data, metadata_file)
-                    translations = generate_translation_file(sheet, 'ar', translations_data)
-                    logger.info(f"Successfully generated form for {sheet} - {total_questions} questions, {total_answers} answers")
+                    result = future.result()
+                    logger.info(f"Successfully generated form for {sheet} - {result['total_questions']} questions, {result['total_answers']} answers")
+                    if sheet in sheets_to_generate:
+                        write_cached_form_outputs(cache_paths[sheet], result)
+                except BrokenProcessPool:
+                    # A worker process died, the next generation starts a new pool
+                    get_form_executor.clear()
+                    st.error(f"❌ The worker process generating sheet '{sheet}' stopped unexpectedly.")
+                    logger.error(f"Worker process died while generating {sheet}")
+                    continue
                 except MemoryError:
                     st.error(f"❌ Insufficient memory to process sheet '{sheet}'. Try reducing the sheet size.")
                     continue
@@ -285,69 +706,28 @@ def generate_forms_from_sheets(metadata_file, selected_sheets):
                     logger.error(f"Form generation failed for {sheet}: {str(e)}")
                     continue
 
-                # End timing
-                generation_time = time.time() - start_time
+                # Keep the JSON in memory, files are only written when saving to disk
+                form_bytes = result['form_bytes']
+                translation_bytes = result['translation_bytes']
+                safe_name = sheet.replace(' ', '_')
 
-                # Use temp directory or ensure output directory exists and is writable
-                try:
-                    output_dir = 'generated_forms'
-                    os.makedirs(output_dir, exist_ok=True)
-                    # Test write permissions
-                    test_file = os.path.join(output_dir, '.test_write')
-                    with open(test_file, 'w') as f:
-                        f.write('test')
-                    os.remove(test_file)
-                    logger.info(f"Output directory ready: {output_dir}")
-                except (PermissionError, OSError) as e:
-                    # Fallback to temp directory if can't write to generated_forms
-                    output_dir = tempfile.mkdtemp(prefix='formgen_output_')
-                    logger.warning(f"Using temporary output directory: {output_dir}")
-                    st.warning(f"⚠️ Using temporary directory for outputs: {os.path.basename(output_dir)}")
-
-                # Generate filenames
-                form_filename = f"{sheet.replace(' ', '_')}.json"
-                translation_filename = f"{sheet.replace(' ', '_')}_translations_ar.json"
-
-                form_path = os.path.join(output_dir, form_filename)
-                translation_path = os.path.join(output_dir, translation_filename)
-
-                # Convert to JSON strings
-                form_json = json.dumps(form, indent=2)
-                translation_json = json.dumps(translations, indent=2, ensure_ascii=False)
-
-                # Calculate file sizes
-                form_size = len(form_json.encode('utf-8'))
-                translation_size = len(translation_json.encode('utf-8'))
-
-                # Count sections and pages
-                num_pages = len(form.get('pages', []))
-                num_sections = sum(len(page.get('sections', [])) for page in form.get('pages', []))
-
-                # Save files
-                with open(form_path, 'w', encoding='utf-8') as f:
-                    f.write(form_json)
-
-                with open(translation_path, 'w', encoding='utf-8') as f:
-                    f.write(translation_json)
-
-                generated_forms.append({
+                generated_forms[sheet_positions[sheet]] = {
                     'sheet': sheet,
-                    'form_path': form_path,
-                    'translation_path': translation_path,
-                    'total_questions': total_questions,
-                    'total_answers': total_answers,
-                    'form_json': form_json,
-                    'translation_json': translation_json,
-                    'generation_time': generation_time,
-                    'form_size': form_size,
-                    'translation_size': translation_size,
-                    'num_pages': num_pages,
-                    'num_sections': num_sections,
-                    'missing_option_sets': missing_option_sets,
-                    'skip_logic_issues': skip_logic_issues
-                })
-
-                st.success(f"Successfully generated form for {sheet}")
+                    'form_filename': f"{safe_name}.json",
+                    'translation_filename': f"{safe_name}_translations_ar.json",
+                    'total_questions': result['total_questions'],
+                    'total_answers': result['total_answers'],
+                    'form_bytes': form_bytes,
+                    'translation_bytes': translation_bytes,
+                    'generation_time': result['generation_time'],
+                    'cached': result.get('cached', False),
+                    'form_size_kb': len(form_bytes) / 1024,
+                    'translation_size_kb': len(translation_bytes) / 1024,
+                    'num_pages': result['num_pages'],
+                    'num_sections': result['num_sections'],
+                    'missing_option_sets': result['missing_option_sets'],
+                    'skip_logic_issues': result['skip_logic_issues']
+                }
 
             except MemoryError:
                 st.error(f"❌ Out of memory while processing sheet '{sheet}'. Please reduce file size.")
@@ -358,6 +738,11 @@ def generate_forms_from_sheets(metadata_file, selected_sheets):
                 logger.error(f"Error processing sheet {sheet}: {str(e)}")
                 st.info(f"⏭️ Skipping sheet '{sheet}' and continuing with the next one.")
 
+        # Drop the sheets that failed
+        generated_forms = [form for form in generated_forms if form is not None]
+        if generated_forms:
+            st.success(f"Successfully generated {len(generated_forms)} forms in {time.time() - start_time:.2f}s")
+
         return generated_forms
     except MemoryError:
         st.error("❌ Out of memory error. The file is too large to process.")
@@ -373,6 +758,39 @@ def generate_forms_from_sheets(metadata_file, selected_sheets):
         st.info("💡 Please check the file format and try again. If the issue persists, try with a smaller file.")
         return []
 
+def save_generated_forms(generated_forms) -> str:
+    """
+    Save the generated forms and translations to a single zip archive on disk.
+
+    Args:
+        generated_forms: Results returned by generate_forms_from_sheets
+
+    Returns:
+        str: Path to the written archive
+    """
+    # Use temp directory or ensure output directory exists and is writable
+    try:
+        output_dir = Path('generated_forms')
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # Check write permissions with a single access() call rather than a probe file
+        if not os.access(output_dir, os.W_OK):
+            raise PermissionError(f"Output directory is not writable: {output_dir}")
+        logger.info(f"Output directory ready: {output_dir}")
+    except (PermissionError, OSError) as e:
+        # Fallback to temp directory if can't write to generated_forms
+        output_dir = Path(tempfile.mkdtemp(prefix='formgen_output_'))
+        logger.warning(f"Using temporary output directory: {output_dir}")
+        st.warning(f"⚠️ Using temporary directory for outputs: {output_dir.name}")
+
+    archive_path = output_dir / f"forms_{time.strftime('%Y%m%d_%H%M%S')}.zip"
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for form in generated_forms:
+            archive.writestr(form['form_filename'], form['form_bytes'])
+            archive.writestr(form['translation_filename'], form['translation_bytes'])
+
+    logger.info(f"Saved {len(generated_forms)} forms to {archive_path}")
+    return str(archive_path)
+
 def show_configuration_page():
     st.title("🔧 Column Mapping Configuration")
     st.markdown("""
@@ -386,7 +804,7 @@ def show_configuration_page():
     column_mappings = config.get("columns", get_default_column_mappings())
     app_settings = config.get("settings", get_default_app_settings())
 
-    # Check if we have saved settings in localStorage
+    # Prefer the settings saved earlier in this session
     if 'column_mappings' in st.session_state:
         column_mappings = st.session_state.column_mappings
     if 'app_settings' in st.session_state:
@@ -402,7 +820,7 @@ def show_configuration_page():
 
     if uploaded_config is not None:
         try:
-            imported_config = json.load(uploaded_config)
+            imported_config = loads_json(uploaded_config.getvalue())
             if "columns" in imported_config:
                 column_mappings = imported_config["columns"]
                 st.session_state.column_mappings = column_mappings
@@ -419,49 +837,14 @@ def show_configuration_page():
     with tab1:
         # Create a form for the column configuration
         with st.form("column_mapping_form"):
-            # Group related fields
-            st.subheader("Basic Question Fields")
-            col1, col2 = st.columns(2)
-            with col1:
-                column_mappings["QUESTION_COLUMN"] = st.text_input("Question Column", column_mappings.get("QUESTION_COLUMN", "Question"))
-                column_mappings["LABEL_COLUMN"] = st.text_input("Label Column", column_mappings.get("LABEL_COLUMN", "Label if different"))
-                column_mappings["QUESTION_ID_COLUMN"] = st.text_input("Question ID Column", column_mappings.get("QUESTION_ID_COLUMN", "Question ID"))
-                column_mappings["EXTERNAL_ID_COLUMN"] = st.text_input("External ID Column", column_mappings.get("EXTERNAL_ID_COLUMN", "External ID"))
-
-            with col2:
-                column_mappings["DATATYPE_COLUMN"] = st.text_input("Datatype Column", column_mappings.get("DATATYPE_COLUMN", "Datatype"))
-                column_mappings["MANDATORY_COLUMN"] = st.text_input("Mandatory Column", column_mappings.get("MANDATORY_COLUMN", "Mandatory"))
-                column_mappings["RENDERING_COLUMN"] = st.text_input("Rendering Column", column_mappings.get("RENDERING_COLUMN", "Rendering"))
-                column_mappings["TOOLTIP_COLUMN_NAME"] = st.text_input("Tooltip Column", column_mappings.get("TOOLTIP_COLUMN_NAME", "Tooltip"))
-
-            st.subheader("Layout and Organization")
-            col1, col2 = st.columns(2)
-            with col1:
-                column_mappings["PAGE_COLUMN"] = st.text_input("Page Column", column_mappings.get("PAGE_COLUMN", "Page"))
-                column_mappings["SECTION_COLUMN"] = st.text_input("Section Column", column_mappings.get("SECTION_COLUMN", "Section"))
-                column_mappings["OPTION_SET_COLUMN"] = st.text_input("Option Set Column", column_mappings.get("OPTION_SET_COLUMN", "OptionSet name"))
-
-            st.subheader("Validation and Calculation")
-            col1, col2 = st.columns(2)
-            with col1:
-                column_mappings["VALIDATION_COLUMN"] = st.text_input("Validation Column", column_mappings.get("VALIDATION_COLUMN", "Validation (format)"))
-                column_mappings["LOWER_LIMIT_COLUMN"] = st.text_input("Lower Limit Column", column_mappings.get("LOWER_LIMIT_COLUMN", "Lower limit"))
-                column_mappings["UPPER_LIMIT_COLUMN"] = st.text_input("Upper Limit Column", column_mappings.get("UPPER_LIMIT_COLUMN", "Upper limit"))
-
-            with col2:
-                column_mappings["DEFAULT_VALUE_COLUMN"] = st.text_input("Default Value Column", column_mappings.get("DEFAULT_VALUE_COLUMN", "Default value"))
-                column_mappings["CALCULATION_COLUMN"] = st.text_input("Calculation Column", column_mappings.get("CALCULATION_COLUMN", "Calculation"))
-                column_mappings["SKIP_LOGIC_COLUMN"] = st.text_input("Skip Logic Column", column_mappings.get("SKIP_LOGIC_COLUMN", "Skip logic"))
-
-            st.subheader("Translation Fields")
-            col1, col2 = st.columns(2)
-            with col1:
-                column_mappings["TRANSLATION_SECTION_COLUMN"] = st.text_input("Translation Section Column", column_mappings.get("TRANSLATION_SECTION_COLUMN", "Translation - Section"))
-                column_mappings["TRANSLATION_QUESTION_COLUMN"] = st.text_input("Translation Question Column", column_mappings.get("TRANSLATION_QUESTION_COLUMN", "Translation - Question"))
-
-            with col2:
-                column_mappings["TRANSLATION_TOOLTIP_COLUMN"] = st.text_input("Translation Tooltip Column", column_mappings.get("TRANSLATION_TOOLTIP_COLUMN", "Translation - Tooltip"))
-                column_mappings["TRANSLATION_ANSWER_COLUMN"] = st.text_input("Translation Answer Column", column_mappings.get("TRANSLATION_ANSWER_COLUMN", "Translation"))
+            # Group related fields, each group laid out in two columns
+            for group in dict.fromkeys(field[0] for field in COLUMN_FIELDS):
+                st.subheader(group)
+                cols = st.columns(2)
+                for field_group, col_idx, key, label in COLUMN_FIELDS:
+                    if field_group == group:
+                        with cols[col_idx]:
+                            column_mappings[key] = st.text_input(label, column_mappings.get(key, DEFAULT_COLUMN_MAPPINGS[key]))
 
             # Add buttons for saving and resetting
             col1, col2, col3 = st.columns(3)
@@ -514,18 +897,6 @@ def show_configuration_page():
         if save_config(config):
             st.success("Configuration saved successfully!")
 
-        # Store in localStorage using Streamlit's component
-        st.markdown(
-            """
-            <script>
-            localStorage.setItem('formGeneratorConfig', JSON.stringify(
-                """ + json.dumps(column_mappings) + """
-            ));
-            </script>
-            """,
-            unsafe_allow_html=True
-        )
-
     if reset_button:
         # Reset to defaults
         default_mappings = get_default_column_mappings()
@@ -537,20 +908,30 @@ def show_configuration_page():
 
     if download_button:
         # Create a downloadable config file
-        config_json = json.dumps({"columns": column_mappings, "settings": app_settings}, indent=4)
-        b64 = base64.b64encode(config_json.encode()).decode()
-        href = f'<a href="data:file/json;base64,{b64}" download="config.json">Download config.json</a>'
-        st.markdown(href, unsafe_allow_html=True)
+        st.download_button(
+            label="Download config.json",
+            data=dumps_json({"columns": column_mappings, "settings": app_settings}),
+            file_name="config.json",
+            mime="application/json"
+        )
 
     # Handle application settings form submission
     if save_settings_button:
-        # Save to session state
-        st.session_state.app_settings = app_settings
+        # Reject an invalid sheet filter here rather than when filtering the uploaded sheets
+        sheet_filter_prefix = app_settings["SHEET_FILTER_PREFIX"]
+        try:
+            if sheet_filter_prefix.strip():
+                compile_sheet_filter(sheet_filter_prefix)
+        except re.error as e:
+            st.error(f"❌ Invalid sheet filter prefix '{sheet_filter_prefix}': {str(e)}")
+        else:
+            # Save to session state
+            st.session_state.app_settings = app_settings
 
-        # Save to config.json
-        config["settings"] = app_settings
-        if save_config(config):
-            st.success("Settings saved successfully!")
+            # Save to config.json
+            config["settings"] = app_settings
+            if save_config(config):
+                st.success("Settings saved successfully!")
 
     if reset_settings_button:
         # Reset to defaults
@@ -576,45 +957,11 @@ def main():
         st.session_state.temp_file_path = None
         st.session_state.selected_sheets = []
         st.session_state.forms_generated = False
-        st.session_state.option_sets_initialized = False
         st.session_state.current_page = "home"
 
-        # Try to load saved config from localStorage
-        st.markdown(
-            """
-            <script>
-            const savedConfig = localStorage.getItem('formGeneratorConfig');
-            if (savedConfig) {
-                window.parent.postMessage({
-                    type: 'streamlit:setComponentValue',
-                    value: JSON.parse(savedConfig),
-                    key: 'loaded_config'
-                }, '*');
-            }
-            </script>
-            """,
-            unsafe_allow_html=True
-        )
-
     # Create a sidebar container with custom CSS for vertical alignment
     st.sidebar.markdown(
-        """
-        <style>
-        [data-testid="stSidebar"] {
-            display: flex;
-            flex-direction: column;
-        }
-        .sidebar-content {
-            flex-grow: 1;
-        }
-        .sidebar-footer {
-            margin-top: auto;
-            text-align: center;
-            padding-bottom: 20px;
-        }
-        </style>
-        <div class="sidebar-content">
-        """,
+        SIDEBAR_HEADER_HTML,
         unsafe_allow_html=True
     )
 
@@ -627,29 +974,24 @@ def main():
         label_visibility="hidden"
     )
 
-    # Close the content div and start the footer
-    st.sidebar.markdown("</div><div class='sidebar-footer'>", unsafe_allow_html=True)
-
-    # Add "Powered by" text and Madiro logo at the bottom of the sidebar
-    st.sidebar.markdown("<p style='color: #888; font-size: 0.8em;'>Powered by</p>", unsafe_allow_html=True)
+    # Close the content div, start the footer and add "Powered by" text and Madiro logo at the bottom of the sidebar
+    st.sidebar.markdown(
+        SIDEBAR_FOOTER_HTML,
+        unsafe_allow_html=True
+    )
     st.sidebar.image(
-        "https://raw.githubusercontent.com/MadiroGlobalHealth/clinical-content-tools/refs/heads/main/.github/workflows/madiro.png",
+        MADIRO_LOGO_URL,
         width=100
     )
 
     # Add version number (git commit hash) below the logo
-    commit_hash = get_git_commit()
-    commit_date_unix = get_git_commit_date()
-    try:
-        import datetime
-        commit_date_str = datetime.datetime.fromtimestamp(int(commit_date_unix), datetime.UTC).strftime('%Y-%m-%d')
-    except Exception:
-        commit_date_str = "unknown"
-
-    st.sidebar.markdown(f"<p style='color: #888; font-size: 0.7em;'>Version: {commit_hash} - {commit_date_str}</p>", unsafe_allow_html=True)
+    commit_hash, commit_date_str = get_git_version()
 
-    # Close the footer div
-    st.sidebar.markdown("</div>", unsafe_allow_html=True)
+    # Version and closing footer div
+    st.sidebar.markdown(
+        f"<p style='color: #888; font-size: 0.7em;'>Version: {commit_hash} - {commit_date_str}</p></div>",
+        unsafe_allow_html=True
+    )
 
     if page == "O3 Form Generator":
         st.session_state.current_page = "home"
@@ -658,6 +1000,179 @@ def main():
         st.session_state.current_page = "config"
         show_configuration_page()
 
+def show_json_preview(preview_key: str, json_bytes: bytes):
+    """
+    Display the start of a JSON document, and all of it on request.
+
+    Highlighting large JSON is expensive and sent to the browser on every rerun,
+    so only the first PREVIEW_MAX_BYTES are rendered unless "Show full JSON" is ticked.
+
+    Args:
+        preview_key: Unique key of the preview, used for its checkbox
+        json_bytes: Serialized JSON to preview
+    """
+    if len(json_bytes) > PREVIEW_MAX_BYTES and not st.checkbox("Show full JSON", key=f"full_{preview_key}"):
+        st.code(json_bytes[:PREVIEW_MAX_BYTES].decode('utf-8', errors='ignore') + "\n... (truncated, download for full)", language="json")
+        return
+    st.code(json_bytes.decode('utf-8'), language="json")
+
+@st.fragment
+def show_sheet_picker(form_sheet_names):
+    """
+    Display the sheet selection checkboxes and store the selection in st.session_state.selected_sheets.
+
+    Runs as a fragment, so toggling a checkbox does not rerun the whole page.
+    """
+    st.subheader("Select Sheets to Generate Forms")
+
+    # Create columns for checkboxes to make better use of space
+    num_cols = 3  # Number of columns for checkboxes
+    cols = st.columns(num_cols)
+
+    selected_sheets = []
+    for i, sheet in enumerate(form_sheet_names):
+        col_idx = i % num_cols
+        with cols[col_idx]:
+            if st.checkbox(sheet, key=f"sheet_{sheet}"):
+                selected_sheets.append(sheet)
+
+    st.session_state.selected_sheets = selected_sheets
+
+    # Show selected count
+    if selected_sheets:
+        st.info(f"Selected {len(selected_sheets)} sheets: {', '.join(selected_sheets)}")
+
+@st.fragment
+def show_generated_forms(generated_forms):
+    """
+    Display the generated forms with their statistics, downloads and previews.
+
+    Runs as a fragment, so interacting with the results does not rerun the whole page.
+    """
+    st.subheader("Generated Forms")
+
+    if generated_forms and st.button("Save all to disk"):
+        try:
+            archive_path = save_generated_forms(generated_forms)
+            st.success(f"✅ Saved {len(generated_forms)} forms to {archive_path}")
+        except Exception as e:
+            st.error(f"❌ Error saving forms to disk: {str(e)}")
+            logger.error(f"Saving forms failed: {str(e)}")
+
+    for form in generated_forms:
+        st.markdown(f"### Form: {form['sheet']}")
+
+        # Create a 2x2 grid for metrics
+        metric_cols = st.columns(4)
+        with metric_cols[0]:
+            st.metric("Questions", form['total_questions'])
+        with metric_cols[1]:
+            st.metric("Answers", form['total_answers'])
+        with metric_cols[2]:
+            st.metric("Pages", form['num_pages'])
+        with metric_cols[3]:
+            st.metric("Sections", form['num_sections'])
+
+        # Display missing optionSets if any
+        missing_option_sets = form['missing_option_sets']
+        if missing_option_sets:
+            st.warning(f"⚠️ Found {len(missing_option_sets)} missing optionSets in this form")
+            with st.expander("View missing optionSets"):
+                for missing in missing_option_sets:
+                    st.markdown(f"**Question ID:** {missing['question_id']}")
+                    st.markdown(f"**Question Label:** {missing['question_label']}")
+                    st.markdown(f"**Missing OptionSet:** {missing['optionSet_name']}")
+                    st.markdown("---")
+
+        # Display skip logic validation issues if any
+        skip_logic_issues = form['skip_logic_issues']
+        if skip_logic_issues:
+            # Count issues by status
+            invalid_issues = [issue for issue in skip_logic_issues if issue['status'] == 'invalid']
+            suspect_issues = [issue for issue in skip_logic_issues if issue['status'] == 'suspect']
+            empty_issues = [issue for issue in skip_logic_issues if issue['status'] == 'empty']
+
+            # Show summary
+            total_issues = len(invalid_issues) + len(suspect_issues) + len(empty_issues)
+            if total_issues > 0:
+                if invalid_issues:
+                    st.error(f"🚫 Found {len(invalid_issues)} invalid skip logic expressions")
+                if suspect_issues:
+                    st.warning(f"⚠️ Found {len(suspect_issues)} suspect skip logic expressions")
+                if empty_issues:
+                    st.info(f"ℹ️ Found {len(empty_issues)} empty skip logic fields")
+
+                with st.expander(f"📋 View Skip Logic Issues ({total_issues} total)", expanded=False):
+                    if invalid_issues:
+                        st.subheader("🚫 Invalid Skip Logic")
+                        for issue in invalid_issues:
+                            st.markdown(f"**Question:** {issue['question_label']}")
+                            st.code(issue['expression'], language='text')
+                            for problem in issue['issues']:
+                                st.markdown(f"• {problem}")
+                            st.markdown("---")
+
+                    if suspect_issues:
+                        st.subheader("⚠️ Suspect Skip Logic")
+                        for issue in suspect_issues:
+                            st.markdown(f"**Question:** {issue['question_label']}")
+                            st.code(issue['expression'], language='text')
+                            for problem in issue['issues']:
+                                st.markdown(f"• {problem}")
+                            st.markdown("---")
+
+                    if empty_issues:
+                        st.subheader("ℹ️ Empty Skip Logic")
+                        for issue in empty_issues:
+                            st.markdown(f"**Question:** {issue['question_label']}")
+                            st.markdown("• Skip logic field is empty or contains only whitespace")
+                            st.markdown("---")
+        else:
+            st.success("✅ All skip logic expressions are valid")
+
+        # Add generation stats
+        stat_cols = st.columns(3)
+        with stat_cols[0]:
+            if form['cached']:
+                st.metric("Generation Time", "Cached")
+            else:
+                st.metric("Generation Time", f"{form['generation_time']:.2f}s")
+        with stat_cols[1]:
+            st.metric("Form Size", f"{form['form_size_kb']:.1f} KB")
+        with stat_cols[2]:
+            st.metric("Translation Size", f"{form['translation_size_kb']:.1f} KB")
+
+        # Create columns for form and translation
+        col1, col2 = st.columns(2)
+
+        with col1:
+            # Download button
+            st.download_button(
+                label="Download Form JSON",
+                data=form['form_bytes'],
+                file_name=form['form_filename'],
+                mime='application/json'
+            )
+
+            # Add collapsible JSON preview
+            with st.expander("Preview Form JSON (click to expand)"):
+                show_json_preview(f"form_{form['sheet']}", form['form_bytes'])
+
+        with col2:
+            # Download button
+            st.download_button(
+                label="Download Translation JSON",
+                data=form['translation_bytes'],
+                file_name=form['translation_filename'],
+                mime='application/json'
+            )
+
+            # Add collapsible JSON preview
+            with st.expander("Preview Translation JSON (click to expand)"):
+                show_json_preview(f"translation_{form['sheet']}", form['translation_bytes'])
+
+        st.markdown("---")  # Add a separator between forms
+
 def show_home_page():
     st.title("🏥 OpenMRS 3 Form Generator")
     st.markdown("""
@@ -676,7 +1191,7 @@ def show_home_page():
     if uploaded_file is not None:
         # Use safe file handler for robust file processing
         with st.spinner('🔄 Processing file... Please wait.'):
-            temp_file_path, error_message = safe_file_handler(uploaded_file)
+            temp_file_path, file_hash, error_message = safe_file_handler(uploaded_file)
             
             if error_message:
                 st.error(f"❌ {error_message}")
@@ -693,49 +1208,38 @@ def show_home_page():
                 st.session_state.temp_files_to_cleanup = []
             st.session_state.temp_files_to_cleanup.append(temp_file_path)
 
-        # Initialize option sets with enhanced error handling
-        if not st.session_state.option_sets_initialized:
-            with st.spinner('🔄 Initializing option sets... Please wait.'):
-                try:
-                    initialize_option_sets(temp_file_path)
-                    st.session_state.option_sets_initialized = True
-                    st.success("✅ Option sets initialized successfully")
-                except zipfile.BadZipFile:
-                    st.error("❌ The uploaded file appears to be corrupted or not a valid Excel file.")
-                    st.info("💡 Please try re-saving your Excel file or creating a new one. Make sure to save it in .xlsx format.")
-                    cleanup_temp_file(temp_file_path)
-                    st.stop()
-                except KeyError:
-                    st.error("❌ Missing 'OptionSets' sheet in the Excel file.")
-                    st.info("💡 Please ensure your Excel file contains a sheet named 'OptionSets' with the expected format.")
-                    cleanup_temp_file(temp_file_path)
-                    st.stop()
-                except MemoryError:
-                    st.error("❌ File too large to process - insufficient memory for option sets.")
-                    st.info("💡 Try reducing the size of your OptionSets sheet or the overall file size.")
-                    cleanup_temp_file(temp_file_path)
-                    st.stop()
-                except Exception as e:
-                    st.error(f"❌ Error initializing option sets: {str(e)}")
-                    st.info("💡 Please ensure your Excel file has a sheet named 'OptionSets' with the expected format.")
-                    logger.error(f"Option sets initialization failed: {str(e)}")
-                    cleanup_temp_file(temp_file_path)
-                    st.stop()
+            st.session_state.xlsx_hash = file_hash
+
+        # Read sheet names and initialize option sets once per uploaded file content
+        with st.spinner('🔄 Initializing option sets... Please wait.'):
+            try:
+                all_sheet_names = load_sheet_names(st.session_state.xlsx_hash, temp_file_path)
+                ensure_option_sets(temp_file_path, st.session_state.xlsx_hash)
+            except zipfile.BadZipFile:
+                st.error("❌ The uploaded file appears to be corrupted or not a valid Excel file.")
+                st.info("💡 Please try re-saving your Excel file or creating a new one. Make sure to save it in .xlsx format.")
+                cleanup_temp_file(temp_file_path)
+                st.stop()
+            except KeyError:
+                st.error("❌ Missing 'OptionSets' sheet in the Excel file.")
+                st.info("💡 Please ensure your Excel file contains a sheet named 'OptionSets' with the expected format.")
+                cleanup_temp_file(temp_file_path)
+                st.stop()
+            except MemoryError:
+                st.error("❌ File too large to process - insufficient memory for option sets.")
+                st.info("💡 Try reducing the size of your OptionSets sheet or the overall file size.")
+                cleanup_temp_file(temp_file_path)
+                st.stop()
+            except Exception as e:
+                st.error(f"❌ Error initializing option sets: {str(e)}")
+                st.info("💡 Please ensure your Excel file has a sheet named 'OptionSets' with the expected format.")
+                logger.error(f"Option sets initialization failed: {str(e)}")
+                cleanup_temp_file(temp_file_path)
+                st.stop()
 
         # Update environment variable for metadata file path
         os.environ['METADATA_FILEPATH'] = temp_file_path
 
-        # Extract sheet names with enhanced error handling
-        try:
-            wb = openpyxl.load_workbook(temp_file_path, read_only=True, data_only=True)
-            all_sheet_names = wb.sheetnames
-            wb.close()
-            logger.info(f"Retrieved {len(all_sheet_names)} sheet names from Excel file")
-        except Exception as e:
-            st.error(f"❌ Error reading sheet names: {str(e)}")
-            cleanup_temp_file(temp_file_path)
-            st.stop()
-
         # Get the configured sheet filter prefix from settings
         config = load_config()
         sheet_filter_prefix = config.get("settings", {}).get("SHEET_FILTER_PREFIX", "F\\d{2}")
@@ -745,7 +1249,13 @@ def show_home_page():
             form_sheet_names = all_sheet_names
         else:
             # Filter sheets based on the configured prefix
-            form_sheet_names = [sheet for sheet in all_sheet_names if re.match(f'^{sheet_filter_prefix}', sheet)]
+            try:
+                sheet_filter = compile_sheet_filter(sheet_filter_prefix)
+                form_sheet_names = list(filter(sheet_filter.match, all_sheet_names))
+            except re.error as e:
+                st.error(f"❌ Invalid sheet filter prefix '{sheet_filter_prefix}': {str(e)}")
+                st.info("💡 Please fix the Sheet Filter Prefix in the Configuration page. Showing all sheets.")
+                form_sheet_names = all_sheet_names
 
             # If no sheets match the filter, show all sheets
             if not form_sheet_names:
@@ -753,22 +1263,8 @@ def show_home_page():
                 st.info("No sheets matched the configured filter. Showing all sheets.")
 
         # Sheet selection with checkboxes
-        st.subheader("Select Sheets to Generate Forms")
-
-        # Create columns for checkboxes to make better use of space
-        num_cols = 3  # Number of columns for checkboxes
-        cols = st.columns(num_cols)
-
-        selected_sheets = []
-        for i, sheet in enumerate(form_sheet_names):
-            col_idx = i % num_cols
-            with cols[col_idx]:
-                if st.checkbox(sheet, key=f"sheet_{sheet}"):
-                    selected_sheets.append(sheet)
-
-        # Show selected count
-        if selected_sheets:
-            st.info(f"Selected {len(selected_sheets)} sheets: {', '.join(selected_sheets)}")
+        show_sheet_picker(form_sheet_names)
+        selected_sheets = st.session_state.selected_sheets
 
         # Generate forms button
         generate_button = st.button("Generate Forms", type="primary")
@@ -782,14 +1278,18 @@ def show_home_page():
                     # Create a full-page spinner overlay
                     with st.spinner('🔄 Generating forms... Please wait, this may take a few minutes.'):
                         st.session_state.temp_file_path = temp_file_path
-                        st.session_state.selected_sheets = selected_sheets
                         
                         # Generate forms with progress tracking
                         progress_bar = st.progress(0)
                         status_text = st.empty()
                         
                         try:
-                            st.session_state.generated_forms = generate_forms_from_sheets(temp_file_path, selected_sheets)
+                            st.session_state.generated_forms = generate_forms_from_sheets(
+                                temp_file_path,
+                                selected_sheets,
+                                progress_callback=lambda done, total: progress_bar.progress(done / total),
+                                file_hash=st.session_state.xlsx_hash
+                            )
                             progress_bar.progress(100)
                             status_text.text("✅ Forms generated successfully!")
                             st.session_state.forms_generated = True
@@ -801,132 +1301,12 @@ def show_home_page():
                             status_text.empty()
                         finally:
                             # Clean up progress indicators
-                            import time
                             time.sleep(1)
                             progress_bar.empty()
                             status_text.empty()
 
                 # Display results using the stored generated forms
-                st.subheader("Generated Forms")
-
-                for form in st.session_state.generated_forms:
-                    st.markdown(f"### Form: {form['sheet']}")
-
-                    # Create a 2x2 grid for metrics
-                    metric_cols = st.columns(4)
-                    with metric_cols[0]:
-                        st.metric("Questions", form['total_questions'])
-                    with metric_cols[1]:
-                        st.metric("Answers", form['total_answers'])
-                    with metric_cols[2]:
-                        st.metric("Pages", form.get('num_pages', 'N/A'))
-                    with metric_cols[3]:
-                        st.metric("Sections", form.get('num_sections', 'N/A'))
-
-                    # Display missing optionSets if any
-                    missing_option_sets = form.get('missing_option_sets', [])
-                    if missing_option_sets:
-                        st.warning(f"⚠️ Found {len(missing_option_sets)} missing optionSets in this form")
-                        with st.expander("View missing optionSets"):
-                            for missing in missing_option_sets:
-                                st.markdown(f"**Question ID:** {missing['question_id']}")
-                                st.markdown(f"**Question Label:** {missing['question_label']}")
-                                st.markdown(f"**Missing OptionSet:** {missing['optionSet_name']}")
-                                st.markdown("---")
-
-                    # Display skip logic validation issues if any
-                    skip_logic_issues = form.get('skip_logic_issues', [])
-                    if skip_logic_issues:
-                        # Count issues by status
-                        invalid_issues = [issue for issue in skip_logic_issues if issue['status'] == 'invalid']
-                        suspect_issues = [issue for issue in skip_logic_issues if issue['status'] == 'suspect']
-                        empty_issues = [issue for issue in skip_logic_issues if issue['status'] == 'empty']
-                        
-                        # Show summary
-                        total_issues = len(invalid_issues) + len(suspect_issues) + len(empty_issues)
-                        if total_issues > 0:
-                            if invalid_issues:
-                                st.error(f"🚫 Found {len(invalid_issues)} invalid skip logic expressions")
-                            if suspect_issues:
-                                st.warning(f"⚠️ Found {len(suspect_issues)} suspect skip logic expressions")
-                            if empty_issues:
-                                st.info(f"ℹ️ Found {len(empty_issues)} empty skip logic fields")
-                            
-                            with st.expander(f"📋 View Skip Logic Issues ({total_issues} total)", expanded=False):
-                                if invalid_issues:
-                                    st.subheader("🚫 Invalid Skip Logic")
-                                    for issue in invalid_issues:
-                                        st.markdown(f"**Question:** {issue['question_label']}")
-                                        st.code(issue['expression'], language='text')
-                                        for problem in issue['issues']:
-                                            st.markdown(f"• {problem}")
-                                        st.markdown("---")
-                                
-                                if suspect_issues:
-                                    st.subheader("⚠️ Suspect Skip Logic")
-                                    for issue in suspect_issues:
-                                        st.markdown(f"**Question:** {issue['question_label']}")
-                                        st.code(issue['expression'], language='text')
-                                        for problem in issue['issues']:
-                                            st.markdown(f"• {problem}")
-                                        st.markdown("---")
-                                
-                                if empty_issues:
-                                    st.subheader("ℹ️ Empty Skip Logic")
-                                    for issue in empty_issues:
-                                        st.markdown(f"**Question:** {issue['question_label']}")
-                                        st.markdown("• Skip logic field is empty or contains only whitespace")
-                                        st.markdown("---")
-                    else:
-                        st.success("✅ All skip logic expressions are valid")
-
-                    # Add generation stats
-                    stat_cols = st.columns(3)
-                    with stat_cols[0]:
-                        st.metric("Generation Time", f"{form.get('generation_time', 0):.2f}s")
-                    with stat_cols[1]:
-                        form_size_kb = form.get('form_size', 0) / 1024
-                        st.metric("Form Size", f"{form_size_kb:.1f} KB")
-                    with stat_cols[2]:
-                        trans_size_kb = form.get('translation_size', 0) / 1024
-                        st.metric("Translation Size", f"{trans_size_kb:.1f} KB")
-
-                    # Create columns for form and translation
-                    col1, col2 = st.columns(2)
-
-                    with col1:
-                        # Form JSON
-                        form_json = form['form_json']
-
-                        # Download button
-                        st.download_button(
-                            label="Download Form JSON",
-                            data=form_json,
-                            file_name=os.path.basename(form['form_path']),
-                            mime='application/json'
-                        )
-
-                        # Add collapsible JSON preview
-                        with st.expander("Preview Form JSON (click to expand)"):
-                            st.code(form_json, language="json")
-
-                    with col2:
-                        # Translation JSON
-                        translation_json = form['translation_json']
-
-                        # Download button
-                        st.download_button(
-                            label="Download Translation JSON",
-                            data=translation_json,
-                            file_name=os.path.basename(form['translation_path']),
-                            mime='application/json'
-                        )
-
-                        # Add collapsible JSON preview
-                        with st.expander("Preview Translation JSON (click to expand)"):
-                            st.code(translation_json, language="json")
-
-                    st.markdown("---")  # Add a separator between forms
+                show_generated_forms(st.session_state.generated_forms)
 
 def cleanup_session_temp_files():
     """Clean up temporary files stored in session state."""
@@ -1,7 +1,11 @@
 """
 A script to generate OpenMRS 3 forms from a metadata file in Excel.
 """
+import datetime
 import json
+import logging
+import math
+import multiprocessing.util
 import os
 import re
 import time
@@ -11,10 +15,16 @@ import pandas as pd
 import zipfile
 from dotenv import load_dotenv
 
+try:
+    # C JSON serializer, several times faster than the json module on large forms
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load the environment variables
 load_dotenv()
 
-import os
+logger = logging.getLogger(__name__)
 
 # Load the configuration settings from config.json
 config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config.json')
@@ -55,6 +65,27 @@ PAGE_COLUMN = config.get('columns', {}).get('PAGE_COLUMN', 'Page')
 SECTION_COLUMN = config.get('columns', {}).get('SECTION_COLUMN', 'Section')
 OPTION_SET_COLUMN = config.get('columns', {}).get('OPTION_SET_COLUMN', 'OptionSet name')
 
+# Names of the column mapping settings above, which configure_columns may override
+COLUMN_SETTINGS = (
+    'TRANSLATION_SECTION_COLUMN', 'TRANSLATION_QUESTION_COLUMN', 'TRANSLATION_TOOLTIP_COLUMN',
+    'TRANSLATION_ANSWER_COLUMN', 'TOOLTIP_COLUMN_NAME', 'QUESTION_COLUMN', 'LABEL_COLUMN',
+    'QUESTION_ID_COLUMN', 'EXTERNAL_ID_COLUMN', 'DATATYPE_COLUMN', 'VALIDATION_COLUMN',
+    'MANDATORY_COLUMN', 'RENDERING_COLUMN', 'LOWER_LIMIT_COLUMN', 'UPPER_LIMIT_COLUMN',
+    'DEFAULT_VALUE_COLUMN', 'CALCULATION_COLUMN', 'SKIP_LOGIC_COLUMN', 'PAGE_COLUMN',
+    'SECTION_COLUMN', 'OPTION_SET_COLUMN'
+)
+
+# Workbook last generated from in a worker process, with the hash of its content and the
+# finalizer closing it
+worker_file_hash = None
+worker_workbook = None
+worker_workbook_finalizer = None
+
+# Options for serializing generated forms and translations. Translation keys are
+# cell values and may be numbers; pandas hands us numpy scalars for numeric cells.
+if orjson is not None:
+    JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
 # Define option_sets as None initially
 option_sets = None
 
@@ -64,7 +95,7 @@ ALL_QUESTIONS_ANSWERS = []
 # Initialize SKIP_LOGIC_VALIDATION_RESULTS to track validation issues
 SKIP_LOGIC_VALIDATION_RESULTS = []
 
-def read_excel_skip_strikeout(filepath, sheet_name=0, header_row=1):
+def read_excel_skip_strikeout(filepath, sheet_name=0, header_row=1, workbook=None):
     """
     Reads an Excel sheet, skipping any row that has strikethrough formatting
     in any cell. Returns a Pandas DataFrame.
@@ -72,6 +103,7 @@ def read_excel_skip_strikeout(filepath, sheet_name=0, header_row=1):
     :param filepath: Path to the Excel file
     :param sheet_name: Sheet name or index (0-based) to read
     :param header_row: Which row in Excel is the header (1-based index)
+    :param workbook: Optional workbook already opened from filepath, reused instead of opening the file again
     :return: Pandas DataFrame with rows containing strikethrough removed
     """
     logger.info(f"Reading sheet '{sheet_name}' from file: '{filepath}'")
@@ -93,43 +125,55 @@ def read_excel_skip_strikeout(filepath, sheet_name=0, header_row=1):
         logger.warning("Could not determine file size")
 
     try:
-        # Load workbook with memory optimization
-        wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+        # Load workbook with memory optimization, unless an open one was handed over
+        wb = workbook if workbook is not None else open_workbook(filepath)
         ws = wb[sheet_name]
 
+        # Some exporters write a bogus dimension (A1:A1), which makes read-only
+        # worksheets stop after the first cell or rescan the sheet. Others write
+        # none at all, which calculate_dimension reports as an unsized worksheet.
+        try:
+            if ws.calculate_dimension().endswith(':A1'):
+                ws.reset_dimensions()
+        except ValueError:
+            ws.reset_dimensions()
+
         # Convert 1-based to 0-based index for Python lists
         header_idx = header_row - 1
 
-        # Grab all rows as openpyxl cell objects (not values_only=True,
+        # Stream the rows as openpyxl cell objects (not values_only=True,
         # so we can read formatting info).
-        all_rows = list(ws.iter_rows())
+        rows = ws.iter_rows()
+        for _ in range(header_idx):
+            next(rows)
 
         # Identify the header row cells and extract the column names
-        header_cells = all_rows[header_idx]
+        header_cells = next(rows)
         column_names = [cell.value for cell in header_cells]
 
+        # Form sheets are struck out by their question, OptionSets by any cell
+        question_idx = None if sheet_name == 'OptionSets' else column_names.index('Question')
+
+        # Rows are only padded to the sheet width while its dimension is known,
+        # so pad or truncate them to the header width
+        num_columns = len(column_names)
+
         data = []
         # Iterate over the remaining rows after the header
-        for row_idx in range(header_idx + 1, len(all_rows)):
-            row_cells = all_rows[row_idx]
-            row_has_strike = False
-            row_values = []
-
-            for cell in row_cells:
-                # Check if the cell has a font and if that font uses strikethrough
-                if sheet_name == 'OptionSets':
-                    if cell.font and cell.font.strike:
-                        row_has_strike = True
-                        break  # No need to check other cells in this row
-                else:
-                    question_cell = row_cells[column_names.index('Question')]
-                    if question_cell.font and question_cell.font.strike:
-                        row_has_strike = True
-                        break  # No need to check other cells in this row
-                row_values.append(cell.value)
+        for row_cells in rows:
+            # Check if the cell has a font and if that font uses strikethrough
+            if question_idx is None:
+                row_has_strike = any(cell.font and cell.font.strike for cell in row_cells)
+            elif question_idx < len(row_cells):
+                question_cell = row_cells[question_idx]
+                row_has_strike = bool(question_cell.font and question_cell.font.strike)
+            else:
+                row_has_strike = False
 
             if not row_has_strike:
-                data.append(row_values)
+                values = [cell.value for cell in row_cells[:num_columns]]
+                values.extend([None] * (num_columns - len(values)))
+                data.append(values)
 
         # Create a DataFrame from the filtered data
         df = pd.DataFrame(data, columns=column_names)
@@ -139,7 +183,11 @@ def read_excel_skip_strikeout(filepath, sheet_name=0, header_row=1):
     except KeyError:
         raise KeyError(f"Sheet '{sheet_name}' not found in the Excel file.")
     except Exception as e:
-        # Try using pandas directly as a fallback
+        # Try using pandas directly as a fallback, which cannot detect strikethrough
+        logger.warning(
+            f"Could not read sheet '{sheet_name}' with strikeout detection, "
+            f"falling back to pandas: struck out rows will be kept. Cause: {e!r}"
+        )
         try:
             print(f"Attempting to read {sheet_name} with pandas directly using file: {filepath}")
             # Try with openpyxl engine first
@@ -158,15 +206,46 @@ def read_excel_skip_strikeout(filepath, sheet_name=0, header_row=1):
                                f"Pandas fallback with openpyxl failed: {str(pandas_error_openpyxl)}. "
                                f"Default engine fallback also failed: {str(pandas_error_default)}")
 
-def initialize_option_sets(metadata_file=None):
+def open_workbook(filepath):
+    """
+    Open a metadata workbook the way read_excel_skip_strikeout reads it.
+
+    :param filepath: Path to the Excel file
+    :return: Read-only openpyxl workbook, with cached cell values
+    """
+    return openpyxl.load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+
+def initialize_option_sets(metadata_file=None, workbook=None):
     """
     Initialize option_sets from the metadata file
 
     Args:
         metadata_file (str, optional): Path to the metadata file. If None, uses the global METADATA_FILE.
+        workbook (optional): Workbook already opened with open_workbook, reused instead of opening the file again.
+    """
+    set_option_sets(load_option_sets(metadata_file, workbook=workbook))
+
+def set_option_sets(option_sets_data):
+    """
+    Set option_sets from an already loaded OptionSets table.
+
+    Args:
+        option_sets_data (pd.DataFrame): The OptionSets table, as returned by load_option_sets.
     """
     global option_sets
+    option_sets = option_sets_data
 
+def load_option_sets(metadata_file=None, workbook=None):
+    """
+    Read the OptionSets sheet from the metadata file without touching the module state.
+
+    Args:
+        metadata_file (str, optional): Path to the metadata file. If None, uses the global METADATA_FILE.
+        workbook (optional): Workbook already opened with open_workbook, reused instead of opening the file again.
+
+    Returns:
+        pd.DataFrame: The OptionSets table with duplicate column names made unique.
+    """
     # Use the provided metadata_file if available, otherwise use the global METADATA_FILE
     file_to_use = metadata_file if metadata_file else METADATA_FILE
 
@@ -174,7 +253,7 @@ def initialize_option_sets(metadata_file=None):
         raise FileNotFoundError(f"Metadata file not found: '{file_to_use}'")
 
     try:
-        option_sets = read_excel_skip_strikeout(filepath=file_to_use, sheet_name='OptionSets', header_row=2)
+        option_sets = read_excel_skip_strikeout(filepath=file_to_use, sheet_name='OptionSets', header_row=2, workbook=workbook)
 
         # Check for duplicate column names and handle them
         if option_sets.columns.duplicated().any():
@@ -221,6 +300,8 @@ def initialize_option_sets(metadata_file=None):
                                f"Pandas fallback with openpyxl failed: {str(pandas_error_openpyxl)}. "
                                f"Default engine fallback also failed: {str(pandas_error_default)}")
 
+    return option_sets
+
 # Function to fetch options for a given option set
 def get_options(option_set_name, option_sets_override=None):
     """
@@ -757,7 +838,6 @@ def validate_skip_logic_expression(expression: str, questions_answers, question_
     # Check for potential issues even in valid expressions
     if validation_result['status'] == 'valid':
         # Check for missing question references
-        import re
         question_refs = re.findall(r'\[([^\]]+)\]', expression)
         for ref in question_refs:
             # Check if referenced question exists with comprehensive matching
@@ -1125,7 +1205,7 @@ def generate_question(row, columns, question_translations, missing_option_sets=N
 
     return question
 
-def generate_form(sheet_name, form_translations, metadata_file=None):
+def generate_form(sheet_name, form_translations, metadata_file=None, stats=None, workbook=None):
     """
     Generate a form JSON from a sheet of the OptionSets sheet.
 
@@ -1133,6 +1213,9 @@ def generate_form(sheet_name, form_translations, metadata_file=None):
         sheet_name (str): The name of the sheet in the OptionSets sheet.
         form_translations (dict): Dictionary to store translations.
         metadata_file (str, optional): Path to the metadata file. If None, uses the global METADATA_FILE.
+        stats (dict, optional): If provided, filled with the form statistics (total_questions,
+            total_answers, num_pages, num_sections) while the form is built.
+        workbook (optional): Workbook already opened with open_workbook, reused instead of opening the file again.
 
     Returns:
         tuple: A tuple containing (form_data, concept_ids_set, count_total_questions, count_total_answers, missing_option_sets)
@@ -1168,7 +1251,7 @@ def generate_form(sheet_name, form_translations, metadata_file=None):
 
     try:
         # Adjust header to start from row 2 and keep Excel font formatting including strike out characters
-        df = read_excel_skip_strikeout(filepath=file_to_use, sheet_name=sheet_name, header_row=2)
+        df = read_excel_skip_strikeout(filepath=file_to_use, sheet_name=sheet_name, header_row=2, workbook=workbook)
     except Exception as e:
         # Try a direct pandas approach as fallback
         try:
@@ -1197,6 +1280,7 @@ def generate_form(sheet_name, form_translations, metadata_file=None):
     # Keep track of total questions and answers
     count_total_questions = 0
     count_total_answers = 0
+    count_sections = 0
 
     for page in pages:
         page_df = df[df[PAGE_COLUMN] == page]
@@ -1231,6 +1315,7 @@ def generate_form(sheet_name, form_translations, metadata_file=None):
                 len(q['questionOptions']['answers']) if 'answers' in q['questionOptions']
                 else 0 for q in questions
                 )
+            count_sections += 1
 
             form_data["pages"][-1]["sections"].append({
                 "label": section_label,
@@ -1240,6 +1325,14 @@ def generate_form(sheet_name, form_translations, metadata_file=None):
 
     # Get skip logic validation results before returning
     skip_logic_issues = get_skip_logic_validation_results()
+
+    if stats is not None:
+        stats.update({
+            'total_questions': count_total_questions,
+            'total_answers': count_total_answers,
+            'num_pages': len(form_data["pages"]),
+            'num_sections': count_sections
+        })
     
     return form_data, concept_ids_set, count_total_questions, count_total_answers, missing_option_sets, skip_logic_issues
 
@@ -1270,6 +1363,163 @@ def generate_translation_file(form_name, language, translations_list):
 
     return translation_file
 
+def prepare_form_worker(file_hash, option_sets_data, column_config, metadata_file):
+    """
+    Prepare a worker process to generate forms from a workbook.
+
+    Worker processes are shared by all uploads and do not share the module state of the
+    parent process, so every task hands over the option sets and the column mappings. The
+    workbook is only opened again when the worker last generated forms from another one.
+
+    Args:
+        file_hash (str): Hash of the workbook content.
+        option_sets_data (pd.DataFrame): The OptionSets table, as returned by load_option_sets.
+        column_config (dict): Column mappings from the "columns" section of the configuration.
+        metadata_file (str): Path to the metadata file.
+    """
+    global worker_file_hash, worker_workbook, worker_workbook_finalizer
+    set_option_sets(option_sets_data)
+    configure_columns(column_config)
+    if file_hash == worker_file_hash:
+        return
+
+    if worker_workbook_finalizer is not None:
+        worker_workbook_finalizer()
+    worker_file_hash = None
+    worker_workbook = open_workbook(metadata_file)
+    # Close the workbook file when the next workbook replaces it or the worker process exits
+    worker_workbook_finalizer = multiprocessing.util.Finalize(worker_workbook, worker_workbook.close, exitpriority=10)
+    worker_file_hash = file_hash
+
+def generate_worker_form_outputs(sheet_name, file_hash, option_sets_data, column_config, metadata_file):
+    """
+    Generate the form and translation JSON files content for a sheet, in a worker process.
+
+    Args:
+        sheet_name (str): The name of the sheet to generate the form from.
+        file_hash (str): Hash of the workbook content.
+        option_sets_data (pd.DataFrame): The OptionSets table, as returned by load_option_sets.
+        column_config (dict): Column mappings from the "columns" section of the configuration.
+        metadata_file (str): Path to the metadata file.
+
+    Returns:
+        dict: The serialized form and translations, with generation statistics.
+    """
+    prepare_form_worker(file_hash, option_sets_data, column_config, metadata_file)
+    return generate_form_outputs(sheet_name, metadata_file)
+
+def configure_columns(column_config):
+    """
+    Apply column mappings from the "columns" section of the configuration.
+
+    Args:
+        column_config (dict): Column mappings, keys other than COLUMN_SETTINGS are ignored.
+    """
+    module_globals = globals()
+    for key in COLUMN_SETTINGS:
+        if key in column_config:
+            module_globals[key] = column_config[key]
+
+def dumps_json(data, sort_keys=False):
+    """
+    Serialize data to indented UTF-8 JSON bytes, with orjson when it is installed.
+
+    Args:
+        data: The form, translations or configuration to serialize.
+        sort_keys (bool, optional): Whether to sort the keys of objects. Defaults to False.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=(JSON_DUMP_OPTIONS | orjson.OPT_SORT_KEYS) if sort_keys else JSON_DUMP_OPTIONS)
+    return json.dumps(to_json_compatible(data), indent=2, ensure_ascii=False, sort_keys=sort_keys,
+                      allow_nan=False, default=str).encode('utf-8')
+
+def to_json_compatible(data):
+    """
+    Convert data the way orjson serializes it, for the json fallback of dumps_json.
+
+    numpy scalars become their Python value, NaN or infinite floats become None, as json
+    would otherwise write the invalid NaN and Infinity tokens, dates and times become ISO 8601
+    strings, and keys become strings, so that they can be sorted.
+
+    Args:
+        data: The data to convert.
+
+    Returns:
+        The converted data.
+    """
+    if isinstance(data, dict):
+        converted = {}
+        for key, value in data.items():
+            key = to_json_compatible(key)
+            converted[key if isinstance(key, str) else json.dumps(key)] = to_json_compatible(value)
+        return converted
+    if isinstance(data, (list, tuple)):
+        return [to_json_compatible(value) for value in data]
+    if isinstance(data, (datetime.datetime, datetime.date, datetime.time)):
+        return data.isoformat()
+    # numpy scalars expose their Python value through item()
+    if hasattr(data, 'item') and not isinstance(data, (str, bytes)):
+        data = data.item()
+    if isinstance(data, float) and not math.isfinite(data):
+        return None
+    return data
+
+def loads_json(data):
+    """
+    Parse a JSON document, with orjson when it is installed.
+
+    Args:
+        data (bytes or str): The JSON document.
+
+    Returns:
+        The parsed data.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def generate_form_outputs(sheet_name, metadata_file=None, language='ar', workbook=None):
+    """
+    Generate the form and translation JSON files content for a sheet.
+
+    Args:
+        sheet_name (str): The name of the sheet to generate the form from.
+        metadata_file (str, optional): Path to the metadata file. If None, uses the global METADATA_FILE.
+        language (str, optional): The language of the translations. Defaults to 'ar'.
+        workbook (optional): Workbook already opened with open_workbook. Defaults to the workbook
+            opened by prepare_form_worker, if any.
+
+    Returns:
+        dict: The serialized form and translations, with generation statistics.
+    """
+    start_time = time.time()
+
+    translations_data = {}
+    stats = {}
+    form, _, _, _, missing_option_sets, skip_logic_issues = generate_form(
+        sheet_name, translations_data, metadata_file, stats=stats,
+        workbook=workbook if workbook is not None else worker_workbook
+    )
+    translations = generate_translation_file(sheet_name, language, translations_data)
+
+    generation_time = time.time() - start_time
+
+    return {
+        'sheet': sheet_name,
+        'form_bytes': dumps_json(form),
+        'translation_bytes': dumps_json(translations),
+        'total_questions': stats['total_questions'],
+        'total_answers': stats['total_answers'],
+        'num_pages': stats['num_pages'],
+        'num_sections': stats['num_sections'],
+        'generation_time': generation_time,
+        'missing_option_sets': missing_option_sets,
+        'skip_logic_issues': skip_logic_issues
+    }
+
 # Generate forms and save as JSON
 OUTPUT_DIR = './generated_form_schemas'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
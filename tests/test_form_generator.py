@@ -6,6 +6,11 @@ import sys
 import os
 import pandas as pd
 import json
+import re
+import tempfile
+import zipfile
+import openpyxl
+from openpyxl.styles import Font
 from unittest.mock import patch, MagicMock
 
 # Add the src directory to the path
@@ -17,8 +22,44 @@ from form_generator import (
     build_skip_logic_expression,
     get_options,
     generate_question,
-    manage_rendering
+    manage_rendering,
+    read_excel_skip_strikeout,
+    configure_columns,
+    dumps_json,
+    loads_json,
+    generate_form_outputs,
+    load_option_sets,
+    set_option_sets
 )
+import app
+
+
+def form_generator_orjson():
+    """Return the orjson module used by form_generator, skipping the test when it is not installed"""
+    import form_generator
+    if form_generator.orjson is None:
+        raise unittest.SkipTest("orjson is not installed")
+    return form_generator.orjson
+
+
+def save_workbook_parts(wb, filepath, rewrite_part):
+    """Save a workbook, passing each archive part through rewrite_part(name, data), which returns None to drop it"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        saved_path = os.path.join(tmp_dir, 'saved.xlsx')
+        wb.save(saved_path)
+        with zipfile.ZipFile(saved_path) as source, zipfile.ZipFile(filepath, 'w') as target:
+            for item in source.infolist():
+                data = rewrite_part(item.filename, source.read(item.filename))
+                if data is not None:
+                    target.writestr(item, data)
+
+
+def remove_dimension(name, data):
+    """Drop the <dimension> element of worksheets, as some exporters do"""
+    if name.startswith('xl/worksheets/'):
+        return re.sub(rb'<dimension [^>]*/>', b'', data)
+    return data
+
 
 class TestFormGenerator(unittest.TestCase):
     """Test cases for form generator functions"""
@@ -397,6 +438,192 @@ class TestFormGenerator(unittest.TestCase):
         ALL_QUESTIONS_ANSWERS.clear()
         reset_id_modifications()
 
+    def test_read_excel_skip_strikeout(self):
+        """Test that rows with a struck out question are skipped"""
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'F01 Test'
+        ws.append(['Form title'])
+        ws.append(['Question', 'Datatype'])
+        ws.append(['Kept question', 'Text'])
+        ws.append(['Struck question', 'Text'])
+        ws.append(['Other question', 'Coded'])
+        ws['A4'].font = Font(strike=True)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, 'metadata.xlsx')
+            wb.save(filepath)
+            df = read_excel_skip_strikeout(filepath, sheet_name='F01 Test', header_row=2)
+
+        self.assertEqual(list(df.columns), ['Question', 'Datatype'])
+        self.assertEqual(df['Question'].tolist(), ['Kept question', 'Other question'])
+
+    def test_read_excel_skip_strikeout_without_dimension(self):
+        """Test that sheets without a recorded dimension are still read with strikeout detection"""
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'F01 Test'
+        ws.append(['Form title'])
+        ws.append(['Question', 'Datatype'])
+        ws.append(['Kept question', 'Text'])
+        ws.append(['Struck question', 'Text'])
+        ws['A4'].font = Font(strike=True)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, 'metadata.xlsx')
+            save_workbook_parts(wb, filepath, remove_dimension)
+            df = read_excel_skip_strikeout(filepath, sheet_name='F01 Test', header_row=2)
+
+        self.assertEqual(df['Question'].tolist(), ['Kept question'])
+
+    def test_read_excel_skip_strikeout_ragged_rows(self):
+        """Test that rows shorter or longer than the header are fitted to it without a recorded dimension"""
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'F01 Test'
+        ws.append(['Form title'])
+        ws.append(['Label', 'Question', 'Datatype'])
+        ws.append(['Short row'])
+        ws.append([None, 'Kept question', 'Text', 'Past the header'])
+        ws.append([None, 'Struck question', 'Text'])
+        ws['B5'].font = Font(strike=True)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, 'metadata.xlsx')
+            save_workbook_parts(wb, filepath, remove_dimension)
+            with patch('form_generator.pd.read_excel') as read_excel:
+                df = read_excel_skip_strikeout(filepath, sheet_name='F01 Test', header_row=2)
+
+        read_excel.assert_not_called()
+        self.assertEqual(list(df.columns), ['Label', 'Question', 'Datatype'])
+        self.assertEqual(len(df), 2)
+        self.assertEqual(df['Label'].iloc[0], 'Short row')
+        self.assertTrue(pd.isna(df['Question'].iloc[0]))
+        self.assertEqual(df['Question'].iloc[1], 'Kept question')
+
+    def test_configure_columns(self):
+        """Test that column mappings are applied and unknown keys ignored"""
+        import form_generator
+        original_question_column = form_generator.QUESTION_COLUMN
+        try:
+            configure_columns({'QUESTION_COLUMN': 'Question text', 'option_sets': 'ignored'})
+            self.assertEqual(form_generator.QUESTION_COLUMN, 'Question text')
+            self.assertIsNot(form_generator.option_sets, 'ignored')
+        finally:
+            configure_columns({'QUESTION_COLUMN': original_question_column})
+
+    def test_dumps_json_fallback_matches_orjson(self):
+        """Test that the json fallback writes NaN as null, dates in ISO 8601 and non-string keys as strings, like orjson"""
+        import datetime
+        import form_generator
+        data = {
+            'a': float('nan'), 'b': [1.5, float('inf')], 1: 'x',
+            'c': datetime.datetime(2024, 1, 2, 3, 4), 'd': datetime.date(2024, 1, 2), 'e': datetime.time(3, 4),
+            datetime.date(2024, 1, 3): 'y', datetime.datetime(2024, 1, 3, 5, 6): 'z'
+        }
+
+        with patch('form_generator.orjson', None):
+            fallback = dumps_json(data, sort_keys=True)
+
+        self.assertNotIn(b'NaN', fallback)
+        self.assertNotIn(b'Infinity', fallback)
+        self.assertEqual(json.loads(fallback), {
+            'a': None, 'b': [1.5, None], '1': 'x',
+            'c': '2024-01-02T03:04:00', 'd': '2024-01-02', 'e': '03:04:00',
+            '2024-01-03': 'y', '2024-01-03T05:06:00': 'z'
+        })
+        if form_generator.orjson is not None:
+            self.assertEqual(fallback, dumps_json(data, sort_keys=True))
+
+    def test_dumps_json_loads_json_round_trip(self):
+        """Test that JSON written by dumps_json reads back the same, with and without orjson"""
+        data = {'name': 'F01 Test', 'label': 'حمى', 'pages': [{'questions': [1, 2.5, None, True]}]}
+
+        for use_orjson in (True, False):
+            with self.subTest(use_orjson=use_orjson):
+                with patch('form_generator.orjson', form_generator_orjson() if use_orjson else None):
+                    self.assertEqual(loads_json(dumps_json(data)), data)
+                    self.assertEqual(loads_json(dumps_json({'value': float('nan')})), {'value': None})
+                    self.assertIn('حمى'.encode('utf-8'), dumps_json(data))
+
+    def test_generate_form_outputs(self):
+        """Test that a sheet is generated into form and translation JSON bytes with its statistics"""
+        import form_generator
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'OptionSets'
+        ws.append(['Option sets'])
+        ws.append(['OptionSet name', 'Answers', 'External ID', 'Order', 'Translation'])
+        ws.append(['Yes/No', 'Yes', '1065AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA', 1, None])
+        ws.append(['Yes/No', 'No', '1066AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA', 2, None])
+        ws = wb.create_sheet('F01 Test')
+        ws.append(['F01 Test'])
+        ws.append(['Question', 'Datatype', 'Rendering', 'Page', 'Section', 'OptionSet name', 'Translation - Question'])
+        ws.append(['Has fever', 'Coded', 'radio', 'Page 1', 'Vitals', 'Yes/No', 'Fièvre'])
+        ws.append(['Comment', 'Text', 'text', 'Page 1', 'Vitals', None, None])
+
+        original_option_sets = form_generator.option_sets
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                filepath = os.path.join(tmp_dir, 'metadata.xlsx')
+                wb.save(filepath)
+                set_option_sets(load_option_sets(filepath))
+                result = generate_form_outputs('F01 Test', filepath)
+        finally:
+            set_option_sets(original_option_sets)
+
+        self.assertEqual(result['sheet'], 'F01 Test')
+        self.assertEqual(result['total_questions'], 2)
+        self.assertEqual(result['total_answers'], 2)
+        self.assertEqual(result['num_pages'], 1)
+        self.assertEqual(result['num_sections'], 1)
+        self.assertEqual(result['missing_option_sets'], [])
+
+        form = loads_json(result['form_bytes'])
+        self.assertEqual(form['name'], 'F01 Test')
+        questions = form['pages'][0]['sections'][0]['questions']
+        self.assertEqual([question['label'] for question in questions], ['Has fever', 'Comment'])
+
+        translations = loads_json(result['translation_bytes'])
+        self.assertEqual(translations['language'], 'ar')
+        self.assertEqual(translations['translations']['Has fever'], 'Fièvre')
+
+    def test_generate_worker_form_outputs_switches_workbook(self):
+        """Test that a worker keeps its workbook for the same upload and opens the next upload's one"""
+        import form_generator
+        filepaths = []
+        original_option_sets = form_generator.option_sets
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                for questions in (['Weight'], ['Weight', 'Height']):
+                    wb = openpyxl.Workbook()
+                    ws = wb.active
+                    ws.title = 'F01 Test'
+                    ws.append(['F01 Test'])
+                    ws.append(['Question', 'Datatype', 'Rendering', 'Page', 'Section'])
+                    for question in questions:
+                        ws.append([question, 'Numeric', 'number', 'Page 1', 'Vitals'])
+                    filepaths.append(os.path.join(tmp_dir, f'metadata{len(filepaths)}.xlsx'))
+                    wb.save(filepaths[-1])
+                option_sets_data = pd.DataFrame()
+
+                result = form_generator.generate_worker_form_outputs('F01 Test', 'a', option_sets_data, {}, filepaths[0])
+                self.assertEqual(result['total_questions'], 1)
+                workbook = form_generator.worker_workbook
+                result = form_generator.generate_worker_form_outputs('F01 Test', 'a', option_sets_data, {}, filepaths[0])
+                self.assertEqual(result['total_questions'], 1)
+                self.assertIs(form_generator.worker_workbook, workbook)
+
+                result = form_generator.generate_worker_form_outputs('F01 Test', 'b', option_sets_data, {}, filepaths[1])
+                self.assertEqual(result['total_questions'], 2)
+                self.assertIsNot(form_generator.worker_workbook, workbook)
+                form_generator.worker_workbook_finalizer()
+        finally:
+            set_option_sets(original_option_sets)
+            form_generator.worker_file_hash = None
+            form_generator.worker_workbook = None
+            form_generator.worker_workbook_finalizer = None
+
 
 class TestIntegration(unittest.TestCase):
     """Integration tests for the form generator"""
@@ -488,6 +715,93 @@ class TestIntegration(unittest.TestCase):
         reset_id_modifications()
 
 
+class TestApp(unittest.TestCase):
+    """Tests for the helpers of the Streamlit app"""
+
+    def sheet_names_workbook(self):
+        """Return a workbook with sheets F01 and OptionSets"""
+        wb = openpyxl.Workbook()
+        wb.active.title = 'F01'
+        wb.create_sheet('OptionSets')
+        return wb
+
+    def test_read_sheet_names_strict_ooxml(self):
+        """Test that sheet names are listed from strict OOXML workbooks without calamine"""
+        def to_strict(name, data):
+            if name == 'xl/workbook.xml':
+                return data.replace(b'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+                                    b'http://purl.oclc.org/ooxml/spreadsheetml/main')
+            return data
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, 'metadata.xlsx')
+            save_workbook_parts(self.sheet_names_workbook(), filepath, to_strict)
+            with patch('app.CalamineWorkbook', None):
+                self.assertEqual(app.read_sheet_names(filepath), ['F01', 'OptionSets'])
+
+    def test_read_sheet_names_without_workbook_part(self):
+        """Test that a missing xl/workbook.xml is reported as an unreadable file, not a missing sheet"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, 'metadata.xlsx')
+            save_workbook_parts(self.sheet_names_workbook(), filepath, lambda name, data: None if name == 'xl/workbook.xml' else data)
+            with patch('app.CalamineWorkbook', None):
+                with self.assertRaises(zipfile.BadZipFile):
+                    app.read_sheet_names(filepath)
+
+    def test_save_config_skips_unchanged_config(self):
+        """Test that saving a configuration equal to config.json does not rewrite the file"""
+        config = {'columns': {'QUESTION_COLUMN': 'Question'}, 'settings': {'SHEET_FILTER_PREFIX': 'F\\d{2}'}}
+        original_cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                with open('config.json', 'wb') as f:
+                    f.write(dumps_json(config, sort_keys=True))
+
+                with patch.object(app.Path, 'write_bytes') as write_bytes:
+                    self.assertTrue(app.save_config(config))
+                write_bytes.assert_not_called()
+
+                changed_config = {**config, 'columns': {'QUESTION_COLUMN': 'Question text'}}
+                with patch.object(app.Path, 'write_bytes') as write_bytes:
+                    self.assertTrue(app.save_config(changed_config))
+                write_bytes.assert_called_once()
+            finally:
+                os.chdir(original_cwd)
+
+    def test_compile_sheet_filter(self):
+        """Test that the sheet filter matches at the start of sheet names and rejects invalid patterns"""
+        sheet_filter = app.compile_sheet_filter('F\\d{2}')
+        self.assertEqual(list(filter(sheet_filter.match, ['F01 Intake', 'Notes F02', 'F1'])), ['F01 Intake'])
+
+        with self.assertRaises(re.error):
+            app.compile_sheet_filter('F(')
+
+    def test_git_version_looked_up_once_across_reruns(self):
+        """Test that the git version is looked up once, although Streamlit re-executes the app on every rerun"""
+        from streamlit.testing.v1 import AppTest
+        import subprocess
+
+        check_output = subprocess.check_output
+        git_calls = []
+
+        def record_git_calls(args, *other_args, **kwargs):
+            if args[0] == 'git':
+                git_calls.append(args)
+            return check_output(args, *other_args, **kwargs)
+
+        app_path = os.path.join(os.path.dirname(__file__), '..', 'src', 'app.py')
+        app.get_git_version.clear()
+        with patch('subprocess.check_output', side_effect=record_git_calls):
+            for _ in range(2):
+                app_test = AppTest.from_file(app_path, default_timeout=60)
+                app_test.run()
+                app_test.run()
+                self.assertFalse(app_test.exception)
+
+        self.assertEqual(len(git_calls), 1)
+
+
 if __name__ == '__main__':
     # Create test directory if it doesn't exist
     os.makedirs('tests', exist_ok=True)